@@ -19,40 +19,200 @@ os.environ.setdefault("TRANSFORMERS_OFFLINE", "1")  # Prevents transformers from
 os.environ.setdefault("TORCH_HOME", "/var/task/models/torch_home")
 os.environ.setdefault("XDG_CACHE_HOME", "/tmp/.cache")
 os.environ.setdefault("MPLCONFIGDIR", "/tmp/.matplotlib")
+os.environ.setdefault("NUMBA_CACHE_DIR", "/var/task/models/numba_cache")
+
+# Lambda allocates one vCPU per 1769MB of memory. Size the torch/OpenMP thread
+# pools to that slice rather than the host CPU count they would otherwise probe.
+LAMBDA_VCPUS = max(1, round(int(os.environ.get("AWS_LAMBDA_FUNCTION_MEMORY_SIZE", "1769")) / 1769))
+os.environ.setdefault("OMP_NUM_THREADS", str(LAMBDA_VCPUS))
+os.environ.setdefault("MKL_NUM_THREADS", str(LAMBDA_VCPUS))
 
 import json
 import base64
+import binascii
+import contextlib
+import functools
+import hashlib
+import shutil
 import tempfile
+import uuid
 import zipfile
 import io
+import re
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, Any, Optional, Tuple
+from types import SimpleNamespace
+from typing import Dict, Any, BinaryIO, List, Optional, Tuple, Union
+from urllib.parse import urlparse
+
+import urllib3
+
+try:
+    import orjson
+except ImportError:
+    # Fall back to the standard library encoder
+    orjson = None
 
 try:
-    from docling.document_converter import DocumentConverter, PdfFormatOption
-    from docling.datamodel.base_models import InputFormat
-    from docling.datamodel.pipeline_options import PdfPipelineOptions
-    from docling_core.types.doc import ImageRefMode
+    import boto3
+    from botocore.exceptions import BotoCoreError, ClientError
+    # AWS errors from S3/SQS calls, re-raised by job processing so SQS retries
+    STORAGE_ERRORS = (BotoCoreError, ClientError)
 except ImportError:
-    # Fallback for testing without docling installed
-    DocumentConverter = None
-    PdfFormatOption = None
-    InputFormat = None
-    PdfPipelineOptions = None
-    ImageRefMode = None
+    # boto3 ships with the Lambda runtime; only needed for S3 result uploads
+    boto3 = None
+    STORAGE_ERRORS = ()
+
+
+# S3 bucket for /full results too large to return inline. When unset, every
+# zip is returned base64-encoded in the response body.
+RESULT_BUCKET = os.environ.get("RESULT_BUCKET")
+# Zips larger than this are uploaded to RESULT_BUCKET instead (0 uploads all).
+# API Gateway caps responses at 6MB and base64 adds a third on top.
+RESULT_INLINE_MAX_BYTES = int(os.environ.get("RESULT_INLINE_MAX_BYTES", "4500000"))
+# Lifetime of the pre-signed download URL, in seconds
+RESULT_URL_EXPIRES = int(os.environ.get("RESULT_URL_EXPIRES", "3600"))
+# S3 bucket caching markdown results by document content hash. Set a lifecycle
+# expiration rule on the bucket to bound its size; unset disables the cache.
+CACHE_BUCKET = os.environ.get("CACHE_BUCKET")
+# SQS queue for asynchronous jobs. Job inputs and results are kept in
+# RESULT_BUCKET under JOB_PREFIX; the queue triggers this same function.
+JOB_QUEUE_URL = os.environ.get("JOB_QUEUE_URL")
+JOB_PREFIX = "jobs/"
+# torch FP32 matmul precision: "medium" allows BF16 internally on CPUs with
+# AVX-512 BF16/AMX, "highest" keeps full FP32
+TORCH_MATMUL_PRECISION = os.environ.get("TORCH_MATMUL_PRECISION", "medium")
+# Documents whose base64 size exceeds this are processed asynchronously even
+# without "async": true; raw uploads count as if encoded (0 disables the switch)
+ASYNC_DOCUMENT_MIN_BYTES = int(os.environ.get("ASYNC_DOCUMENT_MIN_BYTES", "0"))
+
+
+def json_dumps(obj: Any) -> str:
+    """Serialize to a JSON string, using orjson when available."""
+    if orjson is not None:
+        return orjson.dumps(obj).decode("utf-8")
+    return json.dumps(obj)
+
+
+def json_loads(data: Union[str, bytes]) -> Any:
+    """Parse a JSON string or UTF-8 bytes, using orjson when available."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+@functools.lru_cache(maxsize=1)
+def _lazy_docling() -> Optional[SimpleNamespace]:
+    """
+    Import the Docling classes on first use.
+
+    Docling pulls in torch, transformers, PIL and numpy, so the import is
+    deferred until a conversion needs it; health checks and CORS preflights
+    never pay for it.
+
+    Returns:
+        Namespace of the Docling classes used here, or None if Docling is not
+        installed (e.g. when testing locally)
+    """
+    try:
+        import torch
+        from docling.document_converter import DocumentConverter, PdfFormatOption
+        from docling.datamodel.base_models import DocumentStream, InputFormat
+        from docling.datamodel.pipeline_options import AcceleratorDevice, PdfPipelineOptions
+        from docling_core.types.doc import ImageRefMode
+    except ImportError:
+        return None
+
+    # Let oneDNN run FP32 matmuls in BF16 on CPUs that support it
+    torch.backends.mkldnn.enabled = True
+    torch.set_float32_matmul_precision(TORCH_MATMUL_PRECISION)
+
+    return SimpleNamespace(
+        AcceleratorDevice=AcceleratorDevice,
+        DocumentConverter=DocumentConverter,
+        PdfFormatOption=PdfFormatOption,
+        DocumentStream=DocumentStream,
+        InputFormat=InputFormat,
+        PdfPipelineOptions=PdfPipelineOptions,
+        ImageRefMode=ImageRefMode,
+        torch=torch
+    )
+
+
+@functools.lru_cache(maxsize=4)
+def _get_converter(do_ocr: bool, generate_picture_images: bool):
+    """
+    Return a cached DocumentConverter for the given pipeline options.
+
+    Building a converter wires up the Docling pipeline and its models, so warm
+    Lambda containers reuse the instance instead of rebuilding it per request.
+    """
+    docling = _lazy_docling()
+    pipeline_options = docling.PdfPipelineOptions()
+    pipeline_options.do_ocr = do_ocr
+    pipeline_options.generate_picture_images = generate_picture_images
+    pipeline_options.accelerator_options.num_threads = int(os.environ["OMP_NUM_THREADS"])
+    # Lambda has no GPU; skip device probing
+    pipeline_options.accelerator_options.device = docling.AcceleratorDevice.CPU
+
+    return docling.DocumentConverter(
+        format_options={
+            docling.InputFormat.PDF: docling.PdfFormatOption(pipeline_options=pipeline_options)
+        }
+    )
+
+
+# Small PDF baked into the image during Docker build, used to exercise the
+# full model graph before the first request arrives
+WARMUP_DOCUMENT = Path("/var/task/models/warmup.pdf")
+
+
+def _prewarm(warmup: bool) -> None:
+    """
+    Build both converters and their PDF pipelines, optionally running a
+    throwaway conversion through each.
+
+    Runs at module import so the Lambda INIT phase absorbs model loading
+    instead of the first billed request. On-demand INIT is capped at 10
+    seconds (Lambda re-runs a timed-out INIT inside the first invocation), so
+    the warmup conversions are only worth it under provisioned concurrency.
+    """
+    try:
+        docling = _lazy_docling()
+        for generate_picture_images in (False, True):
+            converter = _get_converter(False, generate_picture_images)
+            converter.initialize_pipeline(docling.InputFormat.PDF)
+            if warmup and WARMUP_DOCUMENT.exists():
+                converter.convert(WARMUP_DOCUMENT)
+    except Exception as e:
+        # Never fail INIT; the first request will load whatever is missing
+        print(f"Prewarm failed: {type(e).__name__}: {e}")
+
+
+# Importing Docling here is deliberate: with prewarming on, the INIT phase
+# absorbs the import too. DOCLING_PREWARM is "1" (build converters, the
+# default), "full" (also run warmup conversions) or "0" (keep cold starts light).
+DOCLING_PREWARM = os.environ.get("DOCLING_PREWARM", "1")
+if DOCLING_PREWARM in ("1", "full") and _lazy_docling() is not None:
+    _prewarm(warmup=DOCLING_PREWARM == "full")
+
+
+# Response headers are shared across responses rather than rebuilt per request
+CORS_HEADERS = {
+    "Access-Control-Allow-Origin": "*",
+    "Access-Control-Allow-Headers": "Content-Type, X-Filename",
+    "Access-Control-Allow-Methods": "POST, OPTIONS"
+}
+JSON_HEADERS = {"Content-Type": "application/json", **CORS_HEADERS}
+ZIP_HEADERS = {"Content-Type": "application/zip", **CORS_HEADERS}
 
 
 def create_response(status_code: int, body: Dict[str, Any]) -> Dict[str, Any]:
     """Create a properly formatted API Gateway response."""
     return {
         "statusCode": status_code,
-        "headers": {
-            "Content-Type": "application/json",
-            "Access-Control-Allow-Origin": "*",
-            "Access-Control-Allow-Headers": "Content-Type",
-            "Access-Control-Allow-Methods": "POST, OPTIONS"
-        },
-        "body": json.dumps(body)
+        "headers": JSON_HEADERS,
+        "body": json_dumps(body)
     }
 
 
@@ -61,17 +221,18 @@ def create_binary_response(status_code: int, body: bytes, filename: str) -> Dict
     return {
         "statusCode": status_code,
         "headers": {
-            "Content-Type": "application/zip",
-            "Content-Disposition": f'attachment; filename="{filename}"',
-            "Access-Control-Allow-Origin": "*",
-            "Access-Control-Allow-Headers": "Content-Type",
-            "Access-Control-Allow-Methods": "POST, OPTIONS"
+            **ZIP_HEADERS,
+            "Content-Disposition": f'attachment; filename="{filename}"'
         },
         "body": base64.b64encode(body).decode("utf-8"),
         "isBase64Encoded": True
     }
 
 
+# Content types accepted as a raw document body instead of JSON
+RAW_CONTENT_TYPES = ("application/pdf", "application/octet-stream")
+
+
 def parse_event(event: Dict[str, Any]) -> Dict[str, Any]:
     """
     Parse Lambda event from various sources.
@@ -80,6 +241,8 @@ def parse_event(event: Dict[str, Any]) -> Dict[str, Any]:
     - API Gateway proxy integration (body as JSON string)
     - Direct Lambda invocation (event is the payload)
     - API Gateway with base64 encoded body
+    - Raw document upload (Content-Type application/pdf or
+      application/octet-stream, filename in the X-Filename header)
     """
     # Check if this is an API Gateway event
     if "body" in event:
@@ -87,14 +250,26 @@ def parse_event(event: Dict[str, Any]) -> Dict[str, Any]:
         if body is None:
             return {}
 
-        # Handle base64 encoded body from API Gateway
+        # Raw uploads skip JSON entirely; API Gateway delivers binary media
+        # types base64 encoded, which is decoded once straight to bytes
+        headers = {k.lower(): v for k, v in (event.get("headers") or {}).items()}
+        content_type = headers.get("content-type", "")
+        if event.get("isBase64Encoded", False) and content_type.startswith(RAW_CONTENT_TYPES):
+            return {
+                "document_bytes": base64.b64decode(body),
+                "filename": headers.get("x-filename", "document.pdf")
+            }
+
+        # Handle base64 encoded body from API Gateway. The decoded bytes are
+        # parsed directly rather than copied into a str first.
         if event.get("isBase64Encoded", False):
-            body = base64.b64decode(body).decode("utf-8")
+            body = base64.b64decode(body)
 
         # Parse JSON body
-        if isinstance(body, str):
+        if isinstance(body, (str, bytes)):
             try:
-                return json.loads(body)
+                # orjson.JSONDecodeError subclasses json.JSONDecodeError
+                return json_loads(body)
             except json.JSONDecodeError:
                 return {}
         return body
@@ -103,54 +278,250 @@ def parse_event(event: Dict[str, Any]) -> Dict[str, Any]:
     return event
 
 
-def create_zip_with_images(result, source_name: str) -> Tuple[bytes, int]:
+# Zips are built in memory up to this size, then spill to /tmp
+ZIP_SPOOL_MAX_SIZE = 8 * 1024 * 1024
+
+# Base64 characters decoded per step; a multiple of 4 so chunks never split a quantum
+BASE64_CHUNK_SIZE = 1 << 20
+# Any character outside the standard base64 alphabet and padding
+NON_BASE64_CHAR = re.compile(r"[^A-Za-z0-9+/=]")
+
+
+@functools.lru_cache(maxsize=1)
+def _get_s3_client():
+    """Return a cached S3 client, reused across warm invocations."""
+    return boto3.client("s3")
+
+
+@functools.lru_cache(maxsize=1)
+def _get_sqs_client():
+    """Return a cached SQS client, reused across warm invocations."""
+    return boto3.client("sqs")
+
+
+def upload_result(fileobj: BinaryIO, key: str) -> None:
     """
-    Create a zip file containing markdown with relative image references and extracted images.
+    Upload a result to RESULT_BUCKET.
 
     Args:
-        result: The docling conversion result
-        source_name: Base name for the output files
+        fileobj: File object holding the result, positioned at the start
+        key: Key to upload under
+    """
+    # upload_fileobj switches to a multipart upload for large results
+    _get_s3_client().upload_fileobj(
+        fileobj,
+        RESULT_BUCKET,
+        key,
+        ExtraArgs={"ContentType": "application/zip"}
+    )
+
+
+def download_body(key: str, filename: str) -> Dict[str, Any]:
+    """
+    Build the response body pointing at a result uploaded to RESULT_BUCKET.
+
+    The pre-signed URL is generated on every call, so callers that return the
+    same result repeatedly (e.g. job status polls) never hand out a dead link.
 
     Returns:
-        Tuple of (zip_bytes, image_count)
+    {
+        "success": true,
+        "download_url": "...",  # pre-signed GET URL
+        "filename": "document.zip",
+        "expires_in": 3600
+    }
     """
-    zip_buffer = io.BytesIO()
-    image_count = 0
-    image_files = []
+    download_url = _get_s3_client().generate_presigned_url(
+        "get_object",
+        Params={"Bucket": RESULT_BUCKET, "Key": key},
+        ExpiresIn=RESULT_URL_EXPIRES
+    )
+    return {
+        "success": True,
+        "download_url": download_url,
+        "filename": filename,
+        "expires_in": RESULT_URL_EXPIRES
+    }
 
-    with tempfile.TemporaryDirectory() as tmp_dir:
-        tmp_path = Path(tmp_dir)
-        md_file = tmp_path / f"{source_name}.md"
 
-        # Save markdown with referenced images to temp directory
-        result.document.save_as_markdown(
-            md_file,
-            image_mode=ImageRefMode.REFERENCED
+def result_cache_key(document: io.BytesIO, do_ocr: bool, generate_picture_images: bool) -> str:
+    """
+    Build the CACHE_BUCKET key for a document and the pipeline options used.
+
+    Args:
+        document: Decoded document content
+        do_ocr: Whether the pipeline runs OCR
+        generate_picture_images: Whether the pipeline extracts picture images
+
+    Returns:
+        Key of the form "<sha256 of content>/<options hash>.json"
+    """
+    # getvalue() shares the stream's buffer rather than copying it
+    digest = hashlib.sha256(document.getvalue(), usedforsecurity=False).hexdigest()
+    options = f"do_ocr={do_ocr};generate_picture_images={generate_picture_images}"
+    options_hash = hashlib.sha256(options.encode("utf-8"), usedforsecurity=False).hexdigest()[:16]
+    return f"{digest}/{options_hash}.json"
+
+
+def load_cached_result(key: str) -> Optional[Dict[str, Any]]:
+    """Return a cached conversion result, or None on a miss or cache error."""
+    s3 = _get_s3_client()
+    try:
+        response = s3.get_object(Bucket=CACHE_BUCKET, Key=key)
+        return json_loads(response["Body"].read())
+    except s3.exceptions.NoSuchKey:
+        return None
+    except Exception as e:
+        # The cache is an optimization; never fail a conversion because of it
+        print(f"Result cache read failed: {type(e).__name__}: {e}")
+        return None
+
+
+def store_cached_result(key: str, cached: Dict[str, Any]) -> None:
+    """Store a conversion result in CACHE_BUCKET, ignoring cache errors."""
+    try:
+        _get_s3_client().put_object(
+            Bucket=CACHE_BUCKET,
+            Key=key,
+            Body=json_dumps(cached).encode("utf-8"),
+            ContentType="application/json"
         )
+    except Exception as e:
+        print(f"Result cache write failed: {type(e).__name__}: {e}")
+
+
+def decode_document(document_b64: str) -> io.BytesIO:
+    """
+    Decode a base64 document into a stream without holding an encoded bytes copy.
+
+    The decoded bytes are written chunk by chunk into a BytesIO preallocated to
+    the decoded size, so peak memory is the input string plus the output buffer.
+
+    Args:
+        document_b64: Base64 encoded document content
+
+    Returns:
+        Stream positioned at the start of the decoded document
+    """
+    if len(document_b64) < 4 or NON_BASE64_CHAR.search(document_b64):
+        # b64decode discards non-alphabet characters (e.g. line breaks), which
+        # would misalign the chunks; decode such input in one shot
+        return io.BytesIO(base64.b64decode(document_b64))
+
+    stream = io.BytesIO()
+    # Seeking past the end and writing grows the buffer once to the full size
+    stream.seek(len(document_b64) * 3 // 4 - 1)
+    stream.write(b"\0")
 
-        # Collect all image files
-        for file_path in tmp_path.rglob('*'):
-            if file_path.is_file() and file_path.suffix.lower() in ('.png', '.jpg', '.jpeg', '.gif', '.bmp'):
-                image_files.append(file_path)
-                image_count += 1
+    size = 0
+    with stream.getbuffer() as view:
+        for start in range(0, len(document_b64), BASE64_CHUNK_SIZE):
+            chunk = binascii.a2b_base64(document_b64[start:start + BASE64_CHUNK_SIZE])
+            view[size:size + len(chunk)] = chunk
+            size += len(chunk)
 
-        # Read and fix markdown image references to use relative paths
-        md_content = md_file.read_text()
-        for img_file in image_files:
-            # Replace absolute path with just the filename
-            md_content = md_content.replace(str(img_file), img_file.name)
+    # Drop the bytes reserved for padding
+    stream.truncate(size)
+    stream.seek(0)
+    return stream
 
-        # Create zip file in memory
-        with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-            # Add the fixed markdown file
-            zip_file.writestr(f"{source_name}.md", md_content)
 
-            # Add all image files with flat structure
-            for img_file in image_files:
-                zip_file.write(img_file, img_file.name)
+# Connection pool for source_url downloads, kept across warm invocations so
+# repeat hosts skip the TCP/TLS handshake
+HTTP_POOL = urllib3.PoolManager(
+    num_pools=4,
+    maxsize=8,
+    timeout=urllib3.Timeout(connect=3, read=20),
+    retries=urllib3.Retry(3, backoff_factor=0.2)
+)
+
+# Bytes copied per read when downloading a source_url
+DOWNLOAD_CHUNK_SIZE = 1 << 20
+
+
+def fetch_document(source_url: str) -> io.BytesIO:
+    """
+    Download a document into memory.
+
+    Args:
+        source_url: URL of the document
+
+    Returns:
+        Stream positioned at the start of the downloaded document
+
+    Raises:
+        ValueError: If the server responds with an error status
+    """
+    response = HTTP_POOL.request("GET", source_url, preload_content=False)
+    try:
+        if response.status >= 400:
+            # Read off the error body so the connection is clean for reuse
+            response.drain_conn()
+            raise ValueError(f"Failed to download {source_url}: HTTP {response.status}")
+
+        stream = io.BytesIO()
+        try:
+            shutil.copyfileobj(response, stream, length=DOWNLOAD_CHUNK_SIZE)
+        except BaseException:
+            # The body is partially read; close rather than pool the connection
+            response.close()
+            raise
+    finally:
+        response.release_conn()
+
+    stream.seek(0)
+    return stream
+
+
+def source_url_name(source_url: str) -> str:
+    """Return the document name for a source_url, used for format detection."""
+    return Path(urlparse(source_url).path).name or "document.pdf"
+
+
+def create_zip_with_images(result, source_name: str) -> Tuple[BinaryIO, int, str]:
+    """
+    Create a zip file containing markdown with relative image references and extracted images.
+
+    Args:
+        result: The docling conversion result
+        source_name: Base name for the output files
+
+    Returns:
+        Tuple of (zip_file, image_count, md_content). zip_file is a spooled
+        temporary file positioned at the start; the caller is responsible for
+        closing it. md_content is the rendered markdown, so callers that also
+        need it do not have to export the document a second time.
+    """
+    zip_buffer = tempfile.SpooledTemporaryFile(max_size=ZIP_SPOOL_MAX_SIZE)
+    image_count = 0
+
+    # PNG data is already compressed, so images are stored as-is
+    with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_STORED) as zip_file:
+        # Stream each extracted picture straight into the zip, pointing its
+        # reference at the flat filename it is stored under
+        for picture in result.document.pictures:
+            if picture.image is None or picture.image.pil_image is None:
+                continue
+
+            image_name = f"image_{image_count:06}.png"
+            with zip_file.open(image_name, 'w') as image_file:
+                picture.image.pil_image.save(image_file, format='PNG', optimize=False)
+            picture.image.uri = Path(image_name)
+            image_count += 1
+
+        # Render markdown once, already using the relative image references
+        md_content = result.document.export_to_markdown(
+            image_mode=_lazy_docling().ImageRefMode.REFERENCED
+        )
+        zip_file.writestr(
+            f"{source_name}.md",
+            md_content,
+            compress_type=zipfile.ZIP_DEFLATED,
+            compresslevel=1
+        )
 
     zip_buffer.seek(0)
-    return zip_buffer.getvalue(), image_count
+    return zip_buffer, image_count, md_content
 
 
 def convert_document(args: Dict[str, Any]) -> Dict[str, Any]:
@@ -164,6 +535,8 @@ def convert_document(args: Dict[str, Any]) -> Dict[str, Any]:
         "source_url": "https://example.com/doc.pdf",  # alternative to document
     }
 
+    Raw uploads arrive as "document_bytes" (already decoded) instead of "document".
+
     Returns:
     {
         "success": true,
@@ -171,22 +544,13 @@ def convert_document(args: Dict[str, Any]) -> Dict[str, Any]:
         "metadata": {...}
     }
     """
-    # Validate DocumentConverter is available
-    if DocumentConverter is None:
-        return {
-            "status_code": 500,
-            "body": {
-                "success": False,
-                "error": "Docling library not available"
-            }
-        }
-
     # Parse input
     source_url = args.get("source_url")
     document_b64 = args.get("document")
+    document_bytes = args.get("document_bytes")
     filename = args.get("filename", "document.pdf")
 
-    if not source_url and not document_b64:
+    if not source_url and not document_b64 and not document_bytes:
         return {
             "status_code": 400,
             "body": {
@@ -195,35 +559,53 @@ def convert_document(args: Dict[str, Any]) -> Dict[str, Any]:
             }
         }
 
-    # Initialize converter with OCR disabled
-    pipeline_options = PdfPipelineOptions()
-    pipeline_options.do_ocr = False
+    # Process document
+    cache_key = None
+    if not source_url:
+        if document_bytes is not None:
+            document = io.BytesIO(document_bytes)
+        else:
+            document = decode_document(document_b64)
 
-    converter = DocumentConverter(
-        format_options={
-            InputFormat.PDF: PdfFormatOption(pipeline_options=pipeline_options)
+        # Serve repeat conversions of the same content from the result cache
+        if CACHE_BUCKET and boto3 is not None:
+            cache_key = result_cache_key(document, do_ocr=False, generate_picture_images=False)
+            cached = load_cached_result(cache_key)
+            if cached is not None:
+                return {
+                    "status_code": 200,
+                    "body": {
+                        "success": True,
+                        "markdown": cached["markdown"],
+                        "metadata": {
+                            "num_pages": cached["num_pages"],
+                            "source": filename
+                        }
+                    }
+                }
+
+    # Docling and the converter are only needed past the cache, so hits never
+    # import it or build the pipeline
+    docling = _lazy_docling()
+    if docling is None:
+        return {
+            "status_code": 500,
+            "body": {
+                "success": False,
+                "error": "Docling library not available"
+            }
         }
-    )
 
-    # Process document
+    # Get the cached converter with OCR disabled
+    converter = _get_converter(False, False)
+
     if source_url:
-        # Convert from URL
-        result = converter.convert(source_url)
+        # Download with our own pooled client, then convert in memory
+        stream = docling.DocumentStream(name=source_url_name(source_url), stream=fetch_document(source_url))
     else:
-        # Convert from base64 encoded document
-        document_bytes = base64.b64decode(document_b64)
-
-        # Write to temporary file
-        with tempfile.NamedTemporaryFile(delete=False, suffix=Path(filename).suffix) as tmp_file:
-            tmp_file.write(document_bytes)
-            tmp_path = tmp_file.name
-
-        try:
-            result = converter.convert(tmp_path)
-        finally:
-            # Clean up temp file
-            if os.path.exists(tmp_path):
-                os.unlink(tmp_path)
+        # Convert from the uploaded document in memory
+        stream = docling.DocumentStream(name=filename, stream=document)
+    result = converter.convert(stream)
 
     # Export to markdown
     markdown_content = result.document.export_to_markdown()
@@ -234,6 +616,12 @@ def convert_document(args: Dict[str, Any]) -> Dict[str, Any]:
         "source": source_url if source_url else filename
     }
 
+    if cache_key is not None:
+        store_cached_result(cache_key, {
+            "markdown": markdown_content,
+            "num_pages": metadata["num_pages"]
+        })
+
     return {
         "status_code": 200,
         "body": {
@@ -244,7 +632,7 @@ def convert_document(args: Dict[str, Any]) -> Dict[str, Any]:
     }
 
 
-def export_document(args: Dict[str, Any]) -> Dict[str, Any]:
+def export_document(args: Dict[str, Any], key_prefix: Optional[str] = None) -> Dict[str, Any]:
     """
     Export document to a zip file containing markdown with images.
 
@@ -255,15 +643,27 @@ def export_document(args: Dict[str, Any]) -> Dict[str, Any]:
         "source_url": "https://example.com/doc.pdf",  # alternative to document
     }
 
+    Raw uploads arrive as "document_bytes" (already decoded) instead of "document".
+
+    If key_prefix is given, the zip is always uploaded to RESULT_BUCKET under it.
+
     Returns:
     {
         "status_code": 200,
         "zip_bytes": <bytes>,
         "filename": "document.zip"
     }
+
+    or, when the zip is uploaded to RESULT_BUCKET:
+    {
+        "status_code": 200,
+        "result_key": "<key in RESULT_BUCKET>",
+        "filename": "document.zip"
+    }
     """
     # Validate libraries are available
-    if DocumentConverter is None:
+    docling = _lazy_docling()
+    if docling is None:
         return {
             "status_code": 500,
             "error": "Docling library not available"
@@ -272,55 +672,411 @@ def export_document(args: Dict[str, Any]) -> Dict[str, Any]:
     # Parse input
     source_url = args.get("source_url")
     document_b64 = args.get("document")
+    document_bytes = args.get("document_bytes")
     filename = args.get("filename", "document.pdf")
 
-    if not source_url and not document_b64:
+    if not source_url and not document_b64 and not document_bytes:
         return {
             "status_code": 400,
             "error": "Either 'source_url' or 'document' (base64) must be provided"
         }
 
-    # Initialize converter with image extraction enabled
-    pipeline_options = PdfPipelineOptions()
-    pipeline_options.do_ocr = False
-    pipeline_options.generate_picture_images = True
-
-    converter = DocumentConverter(
-        format_options={
-            InputFormat.PDF: PdfFormatOption(pipeline_options=pipeline_options)
-        }
-    )
+    # Get the cached converter with image extraction enabled
+    converter = _get_converter(False, True)
 
     # Process document
     if source_url:
-        # Convert from URL
-        result = converter.convert(source_url)
-        base_name = Path(source_url).stem or "document"
+        # Download with our own pooled client, then convert in memory
+        stream = docling.DocumentStream(name=source_url_name(source_url), stream=fetch_document(source_url))
+        result = converter.convert(stream)
+        base_name = Path(source_url_name(source_url)).stem or "document"
     else:
-        # Convert from base64 encoded document
-        document_bytes = base64.b64decode(document_b64)
+        # Convert from the uploaded document in memory
         base_name = Path(filename).stem
+        if document_bytes is not None:
+            document = io.BytesIO(document_bytes)
+        else:
+            document = decode_document(document_b64)
+        stream = docling.DocumentStream(name=filename, stream=document)
+        result = converter.convert(stream)
 
-        # Write to temporary file
-        with tempfile.NamedTemporaryFile(delete=False, suffix=Path(filename).suffix) as tmp_file:
-            tmp_file.write(document_bytes)
-            tmp_path = tmp_file.name
+    # Create zip with images
+    zip_file, image_count, md_content = create_zip_with_images(result, base_name)
+    zip_filename = f"{base_name}.zip"
 
-        try:
-            result = converter.convert(tmp_path)
-        finally:
-            # Clean up temp file
-            if os.path.exists(tmp_path):
-                os.unlink(tmp_path)
+    with zip_file:
+        zip_size = zip_file.seek(0, os.SEEK_END)
+        zip_file.seek(0)
 
-    # Create zip with images
-    zip_bytes, image_count = create_zip_with_images(result, base_name)
+        # Hand large results back through S3 rather than the response body,
+        # uploading straight from the spooled file
+        upload = RESULT_BUCKET and boto3 is not None and zip_size > RESULT_INLINE_MAX_BYTES
+        if upload or key_prefix:
+            result_key = f"{key_prefix or uuid.uuid4()}/{zip_filename}"
+            upload_result(zip_file, result_key)
+            return {
+                "status_code": 200,
+                "result_key": result_key,
+                "filename": zip_filename
+            }
+
+        zip_bytes = zip_file.read()
 
     return {
         "status_code": 200,
         "zip_bytes": zip_bytes,
-        "filename": f"{base_name}.zip"
+        "filename": zip_filename
+    }
+
+
+def _convert_one(args: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert a single batch entry, capturing failures in its result body."""
+    try:
+        return convert_document(args)["body"]
+    except Exception as e:
+        return {
+            "success": False,
+            "error": str(e),
+            "error_type": type(e).__name__
+        }
+
+
+@contextlib.contextmanager
+def torch_num_threads(num_threads: int):
+    """
+    Temporarily set torch's intra-op thread count.
+
+    The setting is process-wide, which is safe because a Lambda container
+    handles one invocation at a time.
+    """
+    docling = _lazy_docling()
+    if docling is None:
+        yield
+        return
+
+    previous = docling.torch.get_num_threads()
+    docling.torch.set_num_threads(num_threads)
+    try:
+        yield
+    finally:
+        docling.torch.set_num_threads(previous)
+
+
+def convert_batch(args: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Convert several documents to markdown in one invocation.
+
+    Documents are converted concurrently on a thread pool sharing the cached
+    converter; Docling's native model code releases the GIL while it runs.
+    The pool and each conversion's torch threads together stay within the
+    Lambda vCPU allocation.
+
+    Expected input format:
+    {
+        "documents": [
+            {"document": "base64...", "filename": "a.pdf"},
+            {"source_url": "https://example.com/b.pdf"}
+        ]
+    }
+
+    Returns:
+    {
+        "success": true,  # false if any document failed
+        "results": [<convert_document body>, ...]  # in request order
+    }
+    """
+    documents = args.get("documents")
+
+    if not isinstance(documents, list) or not documents:
+        return {
+            "status_code": 400,
+            "body": {
+                "success": False,
+                "error": "'documents' must be a non-empty list"
+            }
+        }
+
+    docling = _lazy_docling()
+    if docling is not None:
+        # Build the shared converter and its PDF pipeline before the pool
+        # starts: lru_cache does not lock and Docling builds pipelines on
+        # first convert, so cold workers would each load their own models
+        _get_converter(False, False).initialize_pipeline(docling.InputFormat.PDF)
+
+    max_workers = min(len(documents), LAMBDA_VCPUS)
+    with torch_num_threads(max(1, LAMBDA_VCPUS // max_workers)):
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(_convert_one, documents))
+
+    return {
+        "status_code": 200,
+        "body": {
+            "success": all(r.get("success") for r in results),
+            "results": results
+        }
+    }
+
+
+def wants_async(args: Dict[str, Any]) -> bool:
+    """Return whether a conversion request should be queued as a job."""
+    if args.get("async"):
+        return True
+    if args.get("document_bytes") is not None:
+        # Compare raw uploads by their base64 size so the threshold is uniform
+        document_size = (len(args["document_bytes"]) + 2) // 3 * 4
+    else:
+        document_size = len(args.get("document") or "")
+    return bool(
+        ASYNC_DOCUMENT_MIN_BYTES
+        and JOB_QUEUE_URL
+        and document_size > ASYNC_DOCUMENT_MIN_BYTES
+    )
+
+
+def submit_job(path: str, args: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Queue a conversion request for asynchronous processing.
+
+    The request is stored in RESULT_BUCKET (SQS messages are limited to 256KB)
+    and a message referencing it is sent to JOB_QUEUE_URL. Raw uploads are
+    stored base64-encoded as "document" so the request stays JSON.
+
+    Returns:
+    {
+        "success": true,
+        "job_id": "uuid",
+        "status_url": "/status/<job_id>"
+    }
+    """
+    if not (RESULT_BUCKET and JOB_QUEUE_URL and boto3 is not None):
+        return {
+            "status_code": 400,
+            "body": {
+                "success": False,
+                "error": "Asynchronous processing is not configured"
+            }
+        }
+
+    job_id = str(uuid.uuid4())
+    request = {k: v for k, v in args.items() if k not in ("async", "document_bytes")}
+    if args.get("document_bytes") is not None:
+        request["document"] = base64.b64encode(args["document_bytes"]).decode("ascii")
+
+    _get_s3_client().put_object(
+        Bucket=RESULT_BUCKET,
+        Key=f"{JOB_PREFIX}{job_id}/request.json",
+        Body=json_dumps(request).encode("utf-8"),
+        ContentType="application/json"
+    )
+    _get_sqs_client().send_message(
+        QueueUrl=JOB_QUEUE_URL,
+        MessageBody=json_dumps({"job_id": job_id, "path": path})
+    )
+
+    return {
+        "status_code": 202,
+        "body": {
+            "success": True,
+            "job_id": job_id,
+            "status_url": f"/status/{job_id}"
+        }
+    }
+
+
+def process_job(job_id: str, path: str) -> None:
+    """
+    Run a queued conversion and store its response body as the job result.
+
+    Conversion errors are recorded in the result so the job is not retried;
+    storage errors, including a failed zip upload inside export_document,
+    propagate so SQS redelivers the message. The request is
+    deleted once the result is stored, so a missing request means a duplicate
+    delivery of a finished job, which is acknowledged without reprocessing.
+
+    Zip results are stored by key rather than URL and pre-signed per status poll.
+    """
+    s3 = _get_s3_client()
+    job_prefix = f"{JOB_PREFIX}{job_id}"
+    request_key = f"{job_prefix}/request.json"
+
+    try:
+        response = s3.get_object(Bucket=RESULT_BUCKET, Key=request_key)
+    except s3.exceptions.NoSuchKey:
+        print(f"Job {job_id} already processed, skipping duplicate message")
+        return
+    args = json_loads(response["Body"].read())
+
+    try:
+        if path == "/full":
+            result = export_document(args, key_prefix=job_prefix)
+            if "error" in result:
+                job_result = {
+                    "status_code": result["status_code"],
+                    "body": {"success": False, "error": result["error"]}
+                }
+            else:
+                job_result = result
+        else:
+            result = convert_document(args)
+            job_result = {"status_code": result["status_code"], "body": result["body"]}
+    except STORAGE_ERRORS:
+        # Transient S3 failures must not be stored as a permanent job result
+        raise
+    except Exception as e:
+        job_result = {
+            "status_code": 500,
+            "body": {
+                "success": False,
+                "error": str(e),
+                "error_type": type(e).__name__
+            }
+        }
+
+    s3.put_object(
+        Bucket=RESULT_BUCKET,
+        Key=f"{job_prefix}/result.json",
+        Body=json_dumps(job_result).encode("utf-8"),
+        ContentType="application/json"
+    )
+    s3.delete_object(Bucket=RESULT_BUCKET, Key=request_key)
+
+
+def get_job_status(job_id: str) -> Dict[str, Any]:
+    """
+    Look up the result of an asynchronous job.
+
+    Returns:
+    {
+        "success": true,
+        "job_id": "uuid",
+        "status": "pending" | "complete",
+        "status_code": 200,  # complete only, status of the conversion
+        "result": {...}  # complete only, the endpoint's response body
     }
+    """
+    try:
+        uuid.UUID(job_id)
+    except ValueError:
+        return {
+            "status_code": 400,
+            "body": {
+                "success": False,
+                "error": f"Invalid job id: {job_id}"
+            }
+        }
+
+    if not RESULT_BUCKET or boto3 is None:
+        return {
+            "status_code": 400,
+            "body": {
+                "success": False,
+                "error": "Asynchronous processing is not configured"
+            }
+        }
+
+    s3 = _get_s3_client()
+    try:
+        response = s3.get_object(Bucket=RESULT_BUCKET, Key=f"{JOB_PREFIX}{job_id}/result.json")
+    except s3.exceptions.NoSuchKey:
+        return {
+            "status_code": 200,
+            "body": {
+                "success": True,
+                "job_id": job_id,
+                "status": "pending"
+            }
+        }
+
+    job_result = json_loads(response["Body"].read())
+    if "result_key" in job_result:
+        body = download_body(job_result["result_key"], job_result["filename"])
+    else:
+        body = job_result["body"]
+
+    return {
+        "status_code": 200,
+        "body": {
+            "success": True,
+            "job_id": job_id,
+            "status": "complete",
+            "status_code": job_result["status_code"],
+            "result": body
+        }
+    }
+
+
+def handle_job_records(records: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Process SQS job messages, reporting failed messages for redelivery.
+
+    Returns an SQS partial batch response; enable ReportBatchItemFailures on
+    the event source mapping so only failed messages are retried.
+    """
+    failures = []
+    for record in records:
+        try:
+            message = json_loads(record["body"])
+            process_job(message["job_id"], message["path"])
+        except Exception as e:
+            print(f"Job message {record.get('messageId')} failed: {type(e).__name__}: {e}")
+            failures.append({"itemIdentifier": record.get("messageId")})
+
+    return {"batchItemFailures": failures}
+
+
+STATUS_PATH_PREFIX = "/status/"
+
+
+def _route_convert(path: str, args: Dict[str, Any]) -> Dict[str, Any]:
+    """Standard conversion endpoint - returns JSON."""
+    if wants_async(args):
+        result = submit_job("/", args)
+    else:
+        result = convert_document(args)
+    return create_response(result["status_code"], result["body"])
+
+
+def _route_export(path: str, args: Dict[str, Any]) -> Dict[str, Any]:
+    """Export endpoint - returns zip with images."""
+    if wants_async(args):
+        result = submit_job(path, args)
+        return create_response(result["status_code"], result["body"])
+
+    result = export_document(args)
+    if "error" in result:
+        return create_response(result["status_code"], {
+            "success": False,
+            "error": result["error"]
+        })
+    if "result_key" in result:
+        return create_response(result["status_code"], download_body(result["result_key"], result["filename"]))
+    return create_binary_response(
+        result["status_code"],
+        result["zip_bytes"],
+        result["filename"]
+    )
+
+
+def _route_batch(path: str, args: Dict[str, Any]) -> Dict[str, Any]:
+    """Batch conversion endpoint - returns JSON array of results."""
+    result = convert_batch(args)
+    return create_response(result["status_code"], result["body"])
+
+
+def _route_status(path: str, args: Dict[str, Any]) -> Dict[str, Any]:
+    """Job status endpoint - returns the job result once complete."""
+    result = get_job_status(path[len(STATUS_PATH_PREFIX):])
+    return create_response(result["status_code"], result["body"])
+
+
+# (method, path) -> route; /status/{job_id} paths are looked up by their prefix
+ROUTES = {
+    ("POST", ""): _route_convert,
+    ("POST", "/"): _route_convert,
+    ("POST", "/full"): _route_export,
+    ("POST", "/batch"): _route_batch,
+    ("GET", STATUS_PATH_PREFIX): _route_status,
+}
 
 
 def handler(event: Dict[str, Any], context: Optional[Any] = None) -> Dict[str, Any]:
@@ -328,12 +1084,17 @@ def handler(event: Dict[str, Any], context: Optional[Any] = None) -> Dict[str, A
     AWS Lambda handler function.
 
     Args:
-        event: Lambda event (API Gateway proxy or direct invocation)
+        event: Lambda event (API Gateway proxy, direct invocation or SQS job batch)
         context: Lambda context object (optional)
 
     Returns:
-        API Gateway compatible response
+        API Gateway compatible response, or an SQS batch response for job batches
     """
+    # Handle queued asynchronous jobs
+    records = event.get("Records")
+    if records and records[0].get("eventSource") == "aws:sqs":
+        return handle_job_records(records)
+
     # Handle CORS preflight
     http_method = event.get("httpMethod") or event.get("requestContext", {}).get("http", {}).get("method")
     if http_method == "OPTIONS":
@@ -344,33 +1105,20 @@ def handler(event: Dict[str, Any], context: Optional[Any] = None) -> Dict[str, A
     if path == "/" and http_method == "GET":
         return create_response(200, {"status": "healthy", "service": "docling-converter"})
 
-    try:
-        # Parse the event to get conversion parameters
-        args = parse_event(event)
+    route_path = STATUS_PATH_PREFIX if path.startswith(STATUS_PATH_PREFIX) else path
+    route = ROUTES.get((http_method, route_path))
+    if route is None:
+        return create_response(404, {
+            "success": False,
+            "error": f"Unknown endpoint: {http_method} {path}"
+        })
 
-        # Route to appropriate handler based on path
-        if path == "/full" and http_method == "POST":
-            # Export endpoint - returns zip with images
-            result = export_document(args)
-            if "error" in result:
-                return create_response(result["status_code"], {
-                    "success": False,
-                    "error": result["error"]
-                })
-            return create_binary_response(
-                result["status_code"],
-                result["zip_bytes"],
-                result["filename"]
-            )
-        elif path in ("", "/") and http_method == "POST":
-            # Standard conversion endpoint - returns JSON
-            result = convert_document(args)
-            return create_response(result["status_code"], result["body"])
-        else:
-            return create_response(404, {
-                "success": False,
-                "error": f"Unknown endpoint: {http_method} {path}"
-            })
+    try:
+        # Parse the event to get conversion parameters. Routing and CORS only
+        # need the envelope, so the (possibly large) body is parsed last and
+        # never for GET routes.
+        args = {} if http_method == "GET" else parse_event(event)
+        return route(path, args)
 
     except Exception as e:
         return create_response(500, {
@@ -10,12 +10,18 @@
 #   ./test_lambda.sh           # Run all tests
 #   ./test_lambda.sh url       # Test URL-based conversion only
 #   ./test_lambda.sh base64    # Test base64 document conversion only
+#   ./test_lambda.sh batch     # Test batch conversion only
+#   ./test_lambda.sh raw       # Test raw PDF upload only
+#   ./test_lambda.sh status    # Test job status validation only
 #
 
 set -e
 
 LAMBDA_URL="http://localhost:9000/2015-03-31/functions/function/invocations"
 
+# Minimal valid PDF that contains "Hello World"
+SAMPLE_PDF_B64="JVBERi0xLjEKMSAwIG9iago8PCAvVHlwZSAvQ2F0YWxvZyAvUGFnZXMgMiAwIFIgPj4KZW5kb2JqCjIgMCBvYmoKPDwgL1R5cGUgL1BhZ2VzIC9LaWRzIFszIDAgUl0gL0NvdW50IDEgPj4KZW5kb2JqCjMgMCBvYmoKPDwgL1R5cGUgL1BhZ2UgL1BhcmVudCAyIDAgUiAvTWVkaWFCb3ggWzAgMCA2MTIgNzkyXQovQ29udGVudHMgNCAwIFIgL1Jlc291cmNlcyA8PCAvRm9udCA8PCAvRjEgNSAwIFIgPj4gPj4gPj4KZW5kb2JqCjQgMCBvYmoKPDwgL0xlbmd0aCA0NCA+PgpzdHJlYW0KQlQKL0YxIDI0IFRmCjEwMCA3MDAgVGQKKEhlbGxvIFdvcmxkISkgVGoKRVQKZW5kc3RyZWFtCmVuZG9iago1IDAgb2JqCjw8IC9UeXBlIC9Gb250IC9TdWJ0eXBlIC9UeXBlMSAvQmFzZUZvbnQgL0hlbHZldGljYSA+PgplbmRvYmoKeHJlZgowIDYKMDAwMDAwMDAwMCA2NTUzNSBmIAowMDAwMDAwMDA5IDAwMDAwIG4gCjAwMDAwMDAwNTggMDAwMDAgbiAKMDAwMDAwMDExNSAwMDAwMCBuIAowMDAwMDAwMjcwIDAwMDAwIG4gCjAwMDAwMDAzNjMgMDAwMDAgbiAKdHJhaWxlcgo8PCAvU2l6ZSA2IC9Sb290IDEgMCBSID4+CnN0YXJ0eHJlZgo0NDIKJSVFT0YK"
+
 # Colors for output
 RED='\033[0;31m'
 GREEN='\033[0;32m'
@@ -105,10 +111,6 @@ test_base64_conversion() {
     echo "Test: Base64 document conversion"
     echo "=========================================="
 
-    # Create a minimal test PDF
-    # This is a minimal valid PDF that contains "Hello World"
-    SAMPLE_PDF_B64="JVBERi0xLjEKMSAwIG9iago8PCAvVHlwZSAvQ2F0YWxvZyAvUGFnZXMgMiAwIFIgPj4KZW5kb2JqCjIgMCBvYmoKPDwgL1R5cGUgL1BhZ2VzIC9LaWRzIFszIDAgUl0gL0NvdW50IDEgPj4KZW5kb2JqCjMgMCBvYmoKPDwgL1R5cGUgL1BhZ2UgL1BhcmVudCAyIDAgUiAvTWVkaWFCb3ggWzAgMCA2MTIgNzkyXQovQ29udGVudHMgNCAwIFIgL1Jlc291cmNlcyA8PCAvRm9udCA8PCAvRjEgNSAwIFIgPj4gPj4gPj4KZW5kb2JqCjQgMCBvYmoKPDwgL0xlbmd0aCA0NCA+PgpzdHJlYW0KQlQKL0YxIDI0IFRmCjEwMCA3MDAgVGQKKEhlbGxvIFdvcmxkISkgVGoKRVQKZW5kc3RyZWFtCmVuZG9iago1IDAgb2JqCjw8IC9UeXBlIC9Gb250IC9TdWJ0eXBlIC9UeXBlMSAvQmFzZUZvbnQgL0hlbHZldGljYSA+PgplbmRvYmoKeHJlZgowIDYKMDAwMDAwMDAwMCA2NTUzNSBmIAowMDAwMDAwMDA5IDAwMDAwIG4gCjAwMDAwMDAwNTggMDAwMDAgbiAKMDAwMDAwMDExNSAwMDAwMCBuIAowMDAwMDAwMjcwIDAwMDAwIG4gCjAwMDAwMDAzNjMgMDAwMDAgbiAKdHJhaWxlcgo8PCAvU2l6ZSA2IC9Sb290IDEgMCBSID4+CnN0YXJ0eHJlZgo0NDIKJSVFT0YK"
-
     echo_info "Sending base64-encoded PDF for conversion..."
 
     RESPONSE=$(curl -s -X POST "$LAMBDA_URL" \
@@ -178,6 +180,115 @@ test_error_handling() {
     fi
 }
 
+# Test batch conversion with one good and one bad document
+test_batch_conversion() {
+    echo ""
+    echo "=========================================="
+    echo "Test: Batch conversion"
+    echo "=========================================="
+
+    echo_info "Sending a batch with a valid PDF and an empty entry..."
+
+    RESPONSE=$(curl -s -X POST "$LAMBDA_URL" \
+        -H "Content-Type: application/json" \
+        -d "{\"path\": \"/batch\", \"httpMethod\": \"POST\", \"body\": \"{\\\"documents\\\": [{\\\"document\\\": \\\"$SAMPLE_PDF_B64\\\", \\\"filename\\\": \\\"test.pdf\\\"}, {}]}\"}")
+
+    # Check if response is valid JSON
+    if ! echo "$RESPONSE" | jq . > /dev/null 2>&1; then
+        echo_error "Invalid JSON response"
+        echo "$RESPONSE"
+        return 1
+    fi
+
+    # Parse response
+    STATUS_CODE=$(echo "$RESPONSE" | jq -r '.statusCode')
+    SUCCESS=$(echo "$RESPONSE" | jq -r '.body' | jq -r '.success')
+    FIRST=$(echo "$RESPONSE" | jq -r '.body' | jq -r '.results[0].success')
+    SECOND=$(echo "$RESPONSE" | jq -r '.body' | jq -r '.results[1].success')
+
+    if [ "$STATUS_CODE" == "200" ] && [ "$SUCCESS" == "false" ] && [ "$FIRST" == "true" ] && [ "$SECOND" == "false" ]; then
+        echo_success "Batch conversion works correctly!"
+        echo_info "Per-document results:"
+        echo "$RESPONSE" | jq -r '.body' | jq '[.results[] | {success, error, source: .metadata.source}]'
+        return 0
+    else
+        echo_error "Batch conversion failed - expected the first entry to succeed and the second to fail"
+        echo "Status code: $STATUS_CODE"
+        echo "Response body:"
+        echo "$RESPONSE" | jq -r '.body' | jq .
+        return 1
+    fi
+}
+
+# Test raw PDF upload (base64 encoded by API Gateway, no JSON wrapping)
+test_raw_upload() {
+    echo ""
+    echo "=========================================="
+    echo "Test: Raw PDF upload"
+    echo "=========================================="
+
+    echo_info "Sending PDF as a raw application/pdf body..."
+
+    RESPONSE=$(curl -s -X POST "$LAMBDA_URL" \
+        -H "Content-Type: application/json" \
+        -d "{\"path\": \"/\", \"httpMethod\": \"POST\", \"headers\": {\"Content-Type\": \"application/pdf\", \"X-Filename\": \"raw.pdf\"}, \"isBase64Encoded\": true, \"body\": \"$SAMPLE_PDF_B64\"}")
+
+    # Check if response is valid JSON
+    if ! echo "$RESPONSE" | jq . > /dev/null 2>&1; then
+        echo_error "Invalid JSON response"
+        echo "$RESPONSE"
+        return 1
+    fi
+
+    # Parse response
+    STATUS_CODE=$(echo "$RESPONSE" | jq -r '.statusCode')
+    SUCCESS=$(echo "$RESPONSE" | jq -r '.body' | jq -r '.success')
+    SOURCE=$(echo "$RESPONSE" | jq -r '.body' | jq -r '.metadata.source')
+
+    if [ "$STATUS_CODE" == "200" ] && [ "$SUCCESS" == "true" ] && [ "$SOURCE" == "raw.pdf" ]; then
+        echo_success "Raw upload conversion successful!"
+        echo_info "Converted markdown:"
+        echo "---"
+        echo "$RESPONSE" | jq -r '.body' | jq -r '.markdown'
+        echo "---"
+        return 0
+    else
+        echo_error "Raw upload conversion failed - expected success with source raw.pdf"
+        echo "Status code: $STATUS_CODE"
+        echo "Response body:"
+        echo "$RESPONSE" | jq -r '.body' | jq .
+        return 1
+    fi
+}
+
+# Test job status lookup with an invalid job id
+test_job_status() {
+    echo ""
+    echo "=========================================="
+    echo "Test: Job status (invalid job id)"
+    echo "=========================================="
+
+    echo_info "Requesting status for a malformed job id..."
+
+    RESPONSE=$(curl -s -X POST "$LAMBDA_URL" \
+        -H "Content-Type: application/json" \
+        -d '{"path": "/status/not-a-job-id", "httpMethod": "GET"}')
+
+    STATUS_CODE=$(echo "$RESPONSE" | jq -r '.statusCode')
+    SUCCESS=$(echo "$RESPONSE" | jq -r '.body' | jq -r '.success')
+
+    if [ "$STATUS_CODE" == "400" ] && [ "$SUCCESS" == "false" ]; then
+        echo_success "Job status validation works correctly!"
+        echo_info "Got expected error response:"
+        echo "$RESPONSE" | jq -r '.body' | jq .
+        return 0
+    else
+        echo_error "Job status test failed - expected 400 status code"
+        echo "$RESPONSE" | jq .
+        return 1
+    fi
+}
+
 # Main execution
 main() {
     echo "=========================================="
@@ -199,14 +310,26 @@ main() {
         error)
             test_error_handling || FAILED=1
             ;;
+        batch)
+            test_batch_conversion || FAILED=1
+            ;;
+        raw)
+            test_raw_upload || FAILED=1
+            ;;
+        status)
+            test_job_status || FAILED=1
+            ;;
         all)
             test_error_handling || FAILED=1
             test_base64_conversion || FAILED=1
+            test_batch_conversion || FAILED=1
+            test_raw_upload || FAILED=1
+            test_job_status || FAILED=1
             test_url_conversion || FAILED=1
             ;;
         *)
             echo "Unknown test type: $TEST_TYPE"
-            echo "Usage: $0 [url|base64|error|all]"
+            echo "Usage: $0 [url|base64|error|batch|raw|status|all]"
             exit 1
             ;;
     esac